@@ -49,8 +49,8 @@ def extract_data(**kwargs):
     
     # Save to a file with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = f'/opt/airflow/data/raw/data_{timestamp}.csv'
-    df.to_csv(output_path, index=False)
+    output_path = f'/opt/airflow/data/raw/data_{timestamp}.parquet'
+    df.to_parquet(output_path, index=False)
     
     # Return the file path for the next task
     return output_path
@@ -67,7 +67,7 @@ def transform_data(**kwargs):
     input_path = ti.xcom_pull(task_ids='extract_data')
     
     # Load the data
-    df = pd.read_csv(input_path)
+    df = pd.read_parquet(input_path)
     
     # Perform transformations (dummy example)
     df['feature3'] = df['feature1'] * df['feature2']
@@ -75,9 +75,9 @@ def transform_data(**kwargs):
     
     # Save processed data
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_path = f'/opt/airflow/data/processed/processed_data_{timestamp}.csv'
+    output_path = f'/opt/airflow/data/processed/processed_data_{timestamp}.parquet'
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
+    df.to_parquet(output_path, index=False)
     
     return output_path
 
@@ -97,7 +97,7 @@ def train_model(**kwargs):
     input_path = ti.xcom_pull(task_ids='transform_data')
     
     # Load the data
-    df = pd.read_csv(input_path)
+    df = pd.read_parquet(input_path)
     
     # Prepare features and target
     X = df.drop(columns=['target'])
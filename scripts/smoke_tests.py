@@ -21,6 +21,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger("smoke-tests")
 
+# Shared session so all checks and retries reuse one keep-alive connection
+session = requests.Session()
+
 
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
@@ -57,9 +60,9 @@ def make_request(
     for attempt in range(retries):
         try:
             if method.upper() == "GET":
-                response = requests.get(url, timeout=10)
+                response = session.get(url, timeout=10)
             elif method.upper() == "POST":
-                response = requests.post(url, json=data, timeout=10)
+                response = session.post(url, json=data, timeout=10)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
@@ -4,8 +4,6 @@ Train a simple demo model for testing the MLOps pipeline.
 """
 import os
 import pickle
-import warnings
-warnings.filterwarnings('ignore')
 
 import numpy as np
 from sklearn.datasets import load_iris
@@ -38,7 +36,8 @@ print(f"Model accuracy: {accuracy:.4f}")
 print("Saving model...")
 model_path = "models/latest/model.pkl"
 with open(model_path, "wb") as f:
-    pickle.dump(model, f)
+    # Protocol 5 pickles numpy array data without intermediate copies
+    pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
 
 # Save some metadata
 print("Saving MLmodel file...")
@@ -27,6 +27,8 @@ setup(
     extras_require={
         "dev": [
             "pytest>=7.0.0",
+            "pytest-xdist>=3.0.0",
+            "numba>=0.57.0",
             "black>=23.0.0",
             "isort>=5.12.0",
             "flake8>=6.0.0",
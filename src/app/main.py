@@ -7,6 +7,7 @@ from typing import Dict, Optional, Union
 import mlflow
 import pandas as pd
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 
 # Configure logging
@@ -50,6 +51,19 @@ class PredictionResult(BaseModel):
     )
 
 
+def _unwrap_pyfunc_model(pyfunc_model):
+    """Return the underlying estimator of an MLflow pyfunc model.
+
+    Calling the raw estimator skips pyfunc's per-request schema enforcement
+    and input coercion, and exposes ``predict_proba`` for classifiers.
+    """
+    impl = getattr(pyfunc_model, "_model_impl", None)
+    impl = getattr(impl, "sklearn_model", impl)
+    if impl is None or not hasattr(impl, "predict"):
+        return pyfunc_model
+    return impl
+
+
 @app.on_event("startup")
 async def load_model():
     """Load the model on startup."""
@@ -65,17 +79,16 @@ async def load_model():
         model_path = os.environ.get("MODEL_PATH", "models/latest")
 
         logger.info(f"Loading model from: {model_path}")
-        model = mlflow.pyfunc.load_model(model_path)
+        model = _unwrap_pyfunc_model(mlflow.pyfunc.load_model(model_path))
         logger.info("Model loaded successfully")
     except Exception as e:
         logger.error(f"Error loading model: {str(e)}")
         model = None
 
 
-@app.get("/")
-async def root():
-    """Root endpoint."""
-    return {
+# Constant responses are serialized once at import time
+_ROOT_RESPONSE = JSONResponse(
+    {
         "message": "Welcome to Innovate Analytics MLOps Project API",
         "version": "0.1.0",
         "endpoints": {
@@ -85,17 +98,30 @@ async def root():
         },
         "docs": "/docs"
     }
+)
+_HEALTHY_RESPONSE = JSONResponse(
+    {
+        "status": "healthy",
+        "message": "Model is loaded and ready for inference",
+    }
+)
+_NOT_LOADED_RESPONSE = JSONResponse(
+    {"status": "error", "message": "Model not loaded"}
+)
+
+
+@app.get("/")
+async def root():
+    """Root endpoint."""
+    return _ROOT_RESPONSE
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     if model is None:
-        return {"status": "error", "message": "Model not loaded"}
-    return {
-        "status": "healthy",
-        "message": "Model is loaded and ready for inference",
-    }
+        return _NOT_LOADED_RESPONSE
+    return _HEALTHY_RESPONSE
 
 
 @app.post("/predict", response_model=PredictionResult)
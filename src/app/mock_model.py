@@ -8,6 +8,9 @@ import numpy as np
 class MockModel:
     """A mock model that always returns class 0."""
 
+    # High confidence for class 0, shared by every predict_proba call
+    _PROBA_ROW = np.array([0.9, 0.05, 0.05])
+
     def __init__(self):
         """Initialize mock model."""
         self.name = "mock_model"
@@ -33,12 +36,7 @@ class MockModel:
             except TypeError:
                 n_samples = 1
 
-        # Generate probabilities with high confidence for class 0
-        probs = np.zeros((n_samples, 3))
-        probs[:, 0] = 0.9  # Class 0
-        probs[:, 1] = 0.05  # Class 1
-        probs[:, 2] = 0.05  # Class 2
-        return probs
+        return np.tile(self._PROBA_ROW, (n_samples, 1))
 
 
 def get_mock_model():
@@ -53,7 +51,7 @@ def save_mock_model(path="models/latest"):
 
     # Save the model
     with open(os.path.join(path, "model.pkl"), "wb") as f:
-        pickle.dump(model, f)
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
 
     # Save MLmodel file
     mlmodel_content = """
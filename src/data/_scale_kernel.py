@@ -0,0 +1,57 @@
+"""Numba kernel for single-pass feature standardization.
+
+numba is an optional dependency; ``standardize_fit_transform`` is None
+when it is not installed.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional
+    njit = None
+
+_EPS = np.finfo(np.float64).eps
+
+
+if njit is not None:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def standardize_fit_transform(X, means_out, vars_out, scales_out):
+        """
+        Standardize the columns of X in place.
+
+        Column statistics are accumulated with Welford's algorithm and the
+        columns are processed in parallel. Columns whose variance is within
+        rounding error of zero get a scale of 1, using the same bound as
+        StandardScaler.
+
+        Args:
+            X: Float64 array of shape (n_samples, n_features), preferably
+                Fortran-ordered so columns are contiguous
+            means_out: Output array for the column means
+            vars_out: Output array for the column variances
+            scales_out: Output array for the column scales
+        """
+        n, f = X.shape
+        for j in prange(f):
+            mean = 0.0
+            m2 = 0.0
+            for i in range(n):
+                delta = X[i, j] - mean
+                mean += delta / (i + 1)
+                m2 += delta * (X[i, j] - mean)
+            var = m2 / n
+            # Same near-constant bound as sklearn's _is_constant_feature
+            upper_bound = n * _EPS * var + (n * mean * _EPS) ** 2
+            scale = math.sqrt(var) if var > upper_bound else 1.0
+            means_out[j] = mean
+            vars_out[j] = var
+            scales_out[j] = scale
+            for i in range(n):
+                X[i, j] = (X[i, j] - mean) / scale
+
+else:
+    standardize_fit_transform = None
@@ -33,20 +33,45 @@ def load_data(file_path: str) -> pd.DataFrame:
         raise ValueError(f"Unsupported file format: {file_path}")
 
 
+def _column_modes(df: pd.DataFrame) -> pd.Series:
+    """
+    Compute the most frequent value of each column.
+
+    Values are counted as integer categorical codes rather than hashed as
+    Python objects. Ties go to the smallest category, as with
+    ``DataFrame.mode``, and all-missing columns get an empty string.
+
+    Args:
+        df: Input DataFrame
+
+    Returns:
+        Mode of each column, indexed by column name
+    """
+    modes = {}
+    for col in df.columns:
+        cat = pd.Categorical(df[col])
+        codes = cat.codes[cat.codes >= 0]
+        modes[col] = (
+            cat.categories[np.bincount(codes).argmax()] if len(codes) else ""
+        )
+    return pd.Series(modes, index=df.columns, dtype=object)
+
+
 def clean_data(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("Cleaning data")
 
     df = df.drop_duplicates()
 
-    for col in df.columns:
-        if np.issubdtype(df[col].dtype, np.number):
-            df[col] = df[col].fillna(df[col].median())
-        else:
-            df[col] = df[col].fillna(
-                df[col].mode()[0] if not df[col].mode().empty else ""
-            )
+    nulls = df.isna().any()
+    if not nulls.any():
+        return df
+
+    # Compute fill values for the incomplete columns and apply them at once
+    missing = df.loc[:, nulls]
+    numeric = missing.select_dtypes(include=np.number)
+    other = missing.select_dtypes(exclude=np.number)
 
-    return df
+    return df.fillna(pd.concat([numeric.median(), _column_modes(other)]))
 
 
 def split_data(
@@ -69,42 +94,80 @@ def split_data(
     """
     logger.info(f"Splitting data with test_size={test_size}")
 
-    X = df.drop(columns=[target_col])
-    y = df[target_col]
+    # Pop the target off a shallow copy instead of copying every feature
+    X = df.copy(deep=False)
+    y = X.pop(target_col)
 
     return train_test_split(
         X, y, test_size=test_size, random_state=random_state
     )
 
 
+def _numba_fit_transform(
+    X_train: pd.DataFrame,
+) -> Optional[Tuple[np.ndarray, StandardScaler]]:
+    """
+    Standardize X_train with the numba kernel and build a fitted scaler.
+
+    Returns None when numba is not installed or X_train has missing values,
+    which the kernel cannot skip the way StandardScaler does.
+    """
+    # Imported here so numba is only loaded when the kernel is requested
+    from src.data._scale_kernel import standardize_fit_transform
+
+    if standardize_fit_transform is None:
+        logger.warning("numba is not installed, using StandardScaler")
+        return None
+
+    X = np.array(X_train, dtype=np.float64, order="F")
+    if np.isnan(X).any():
+        logger.warning("X_train has missing values, using StandardScaler")
+        return None
+    n_samples, n_features = X.shape
+
+    scaler = StandardScaler()
+    scaler.mean_ = np.empty(n_features)
+    scaler.var_ = np.empty(n_features)
+    scaler.scale_ = np.empty(n_features)
+    standardize_fit_transform(X, scaler.mean_, scaler.var_, scaler.scale_)
+    scaler.n_samples_seen_ = n_samples
+    # Record n_features_in_ and feature_names_in_ the way fit would
+    scaler._check_n_features(X, reset=True)
+    scaler._check_feature_names(X_train, reset=True)
+
+    return X, scaler
+
+
 def scale_features(
-    X_train: pd.DataFrame, X_test: Optional[pd.DataFrame] = None
-) -> Tuple[pd.DataFrame, Optional[pd.DataFrame], StandardScaler]:
+    X_train: pd.DataFrame,
+    X_test: Optional[pd.DataFrame] = None,
+    use_numba: bool = False,
+) -> Tuple[np.ndarray, Optional[np.ndarray], StandardScaler]:
     """
     Scale features using StandardScaler.
 
     Args:
         X_train: Training data
         X_test: Test data (optional)
+        use_numba: Fit and transform X_train in a single parallel pass with
+            numba; falls back to StandardScaler when numba is not installed
+            or X_train has missing values
 
     Returns:
-        Scaled X_train, scaled X_test (if provided), and the fitted scaler
+        Scaled X_train, scaled X_test (if provided) as arrays, and the
+        fitted scaler
     """
     logger.info("Scaling features")
 
-    scaler = StandardScaler()
-    X_train_scaled = pd.DataFrame(
-        scaler.fit_transform(X_train),
-        columns=X_train.columns,
-        index=X_train.index,
-    )
+    fitted = _numba_fit_transform(X_train) if use_numba else None
+    if fitted is not None:
+        X_train_scaled, scaler = fitted
+    else:
+        scaler = StandardScaler()
+        X_train_scaled = scaler.fit_transform(X_train)
 
     X_test_scaled = None
     if X_test is not None:
-        X_test_scaled = pd.DataFrame(
-            scaler.transform(X_test),
-            columns=X_test.columns,
-            index=X_test.index,
-        )
+        X_test_scaled = scaler.transform(X_test)
 
     return X_train_scaled, X_test_scaled, scaler
@@ -1,13 +1,15 @@
 """Model training utilities."""
 
 import logging
-
+import os
+from functools import partial
 from typing import Any, Dict, Optional, Tuple
 
 import mlflow
 import mlflow.sklearn
 import numpy as np
 import pandas as pd
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.linear_model import LogisticRegression, Ridge
 from sklearn.metrics import (
@@ -20,10 +22,79 @@ from sklearn.metrics import (
     recall_score,
     roc_auc_score,
 )
-from sklearn.model_selection import GridSearchCV
+from sklearn.model_selection import GridSearchCV, KFold, StratifiedKFold
 
 logger = logging.getLogger(__name__)
 
+# (name, metric function) pairs computed by evaluate_model
+_CLF_METRICS = (
+    ("accuracy", accuracy_score),
+    ("precision", partial(precision_score, average="weighted")),
+    ("recall", partial(recall_score, average="weighted")),
+    ("f1", partial(f1_score, average="weighted")),
+)
+_REG_METRICS = (
+    ("mse", mean_squared_error),
+    ("mae", mean_absolute_error),
+    ("r2", r2_score),
+)
+
+
+def _mlflow_enabled(use_mlflow: bool) -> bool:
+    """
+    Check whether MLflow logging should run.
+
+    Setting the DISABLE_MLFLOW environment variable to "1" turns off all
+    MLflow calls in this module, regardless of use_mlflow.
+
+    Args:
+        use_mlflow: Whether the caller asked for MLflow logging
+
+    Returns:
+        True if MLflow logging should run
+    """
+    return use_mlflow and os.environ.get("DISABLE_MLFLOW") != "1"
+
+
+def _as_arrays(X: Any, y: Any = None) -> Tuple[np.ndarray, Any]:
+    """
+    Convert features and target to plain ndarrays once, up front.
+
+    sklearn otherwise re-validates and copies pandas inputs on every fit
+    and predict call, including each fit inside a grid search.
+
+    Args:
+        X: Feature matrix (DataFrame or array-like)
+        y: Target vector (Series or array-like, optional)
+
+    Returns:
+        C-contiguous feature array and flattened target array (or None)
+    """
+    X = np.ascontiguousarray(X)
+    if y is not None:
+        y = np.asarray(y).ravel()
+    return X, y
+
+
+def _fit_dtype(model: Any) -> Any:
+    """
+    Pick the feature dtype to fit a model on.
+
+    Ridge, the forests and most logistic regression solvers fit float32
+    data as is, halving the memory traffic of the fit. sklearn upcasts to
+    float64 for the lbfgs solver, so downcasting first would only add a
+    copy and lose precision.
+
+    Args:
+        model: Unfitted estimator
+
+    Returns:
+        Feature dtype
+    """
+    if isinstance(model, LogisticRegression) and model.solver == "lbfgs":
+        return np.float64
+    return np.float32
+
 
 def train_model(
     X_train: pd.DataFrame,
@@ -41,48 +112,61 @@ def train_model(
         y_train: Training data target
         model_type: Type of model to train ('classification' or 'regression')
         model_params: Parameters to pass to the model constructor
-        use_mlflow: Whether to log metrics to MLflow
+        use_mlflow: Whether to log metrics to MLflow (ignored when the
+            DISABLE_MLFLOW environment variable is "1")
         experiment_name: MLflow experiment name
 
     Returns:
         Trained model
     """
     logger.info(f"Training {model_type} model")
+    use_mlflow = _mlflow_enabled(use_mlflow)
 
     if model_params is None:
         model_params = {}
 
     if use_mlflow:
         mlflow.set_experiment(experiment_name)
-        mlflow.start_run()
+        mlflow.start_run(nested=mlflow.active_run() is not None)
 
         # Log parameters
-        mlflow.log_param("model_type", model_type)
-        for param, value in model_params.items():
-            mlflow.log_param(param, value)
+        mlflow.log_params({"model_type": model_type, **model_params})
+
+    # Build trees on all cores unless the caller limits it; each worker
+    # holds its own trees in memory while fitting
+    if model_params.get("model_name") == "random_forest":
+        params = {k: v for k, v in model_params.items() if k != "model_name"}
+        params.setdefault("n_jobs", -1)
 
     # Select model based on type
     if model_type == "classification":
         if model_params.get("model_name") == "random_forest":
-            params = {
-                k: v for k, v in model_params.items() if k != "model_name"
-            }
             model = RandomForestClassifier(**params)
         else:
             model = LogisticRegression(**model_params)
     elif model_type == "regression":
         if model_params.get("model_name") == "random_forest":
-            params = {
-                k: v for k, v in model_params.items() if k != "model_name"
-            }
             model = RandomForestRegressor(**params)
         else:
             model = Ridge(**model_params)
     else:
         raise ValueError(f"Unsupported model type: {model_type}")
 
-    # Train model
-    model.fit(X_train, y_train)
+    # Train model on float32 features where the estimator keeps them; a
+    # DataFrame stays a DataFrame so sklearn records its column names
+    dtype = _fit_dtype(model)
+    if isinstance(X_train, pd.DataFrame):
+        X_train = X_train.astype(dtype, copy=False)
+    else:
+        X_train = np.asarray(X_train, dtype=dtype)
+    model.fit(X_train, np.asarray(y_train).ravel())
+
+    # Predict on a single core again unless the caller chose n_jobs; the
+    # API serves one-row requests, where a worker pool costs more than it
+    # saves
+    is_forest = model_params.get("model_name") == "random_forest"
+    if is_forest and "n_jobs" not in model_params:
+        model.set_params(n_jobs=None)
 
     if use_mlflow:
         # Log model to MLflow
@@ -107,45 +191,61 @@ def evaluate_model(
         X_test: Test data features
         y_test: Test data target
         model_type: Type of model ('classification' or 'regression')
-        use_mlflow: Whether to log metrics to MLflow
+        use_mlflow: Whether to log metrics to MLflow (ignored when the
+            DISABLE_MLFLOW environment variable is "1")
 
     Returns:
         Dictionary of evaluation metrics
     """
     logger.info(f"Evaluating {model_type} model")
+    use_mlflow = _mlflow_enabled(use_mlflow)
 
-    y_pred = model.predict(X_test)
+    # Keep column names for models that were fitted with them
+    if not hasattr(model, "feature_names_in_"):
+        X_test, _ = _as_arrays(X_test)
 
     if model_type == "classification":
-        metrics = {
-            "accuracy": accuracy_score(y_test, y_pred),
-            "precision": precision_score(y_test, y_pred, average="weighted"),
-            "recall": recall_score(y_test, y_pred, average="weighted"),
-            "f1": f1_score(y_test, y_pred, average="weighted"),
-        }
+        # The fitted classes tell us whether the task is binary without
+        # scanning y_test
+        if hasattr(model, "classes_"):
+            is_binary = len(model.classes_) == 2
+        else:
+            is_binary = len(np.unique(y_test)) == 2
 
-        # Add ROC AUC if model supports predict_proba
-        if hasattr(model, "predict_proba"):
+        # Derive labels from the probabilities so inference runs only once;
+        # classes_ may be a plain list on non-sklearn models. Without
+        # classes_, probabilities are only needed for binary ROC AUC
+        y_prob = None
+        if hasattr(model, "predict_proba") and hasattr(model, "classes_"):
             y_prob = model.predict_proba(X_test)
-            if len(np.unique(y_test)) == 2:  # Binary classification
+            y_pred = np.take(model.classes_, np.argmax(y_prob, axis=1))
+        else:
+            y_pred = model.predict(X_test)
+            if hasattr(model, "predict_proba") and is_binary:
+                y_prob = model.predict_proba(X_test)
+
+        metrics = {name: fn(y_test, y_pred) for name, fn in _CLF_METRICS}
+
+        # Add ROC AUC for binary classifiers that support predict_proba
+        if y_prob is not None and is_binary:
+            try:
                 metrics["roc_auc"] = roc_auc_score(y_test, y_prob[:, 1])
+            except ValueError as e:
+                # ROC AUC is undefined when y_test holds a single class
+                logger.warning(f"Skipping roc_auc: {e}")
 
     elif model_type == "regression":
-        metrics = {
-            "mse": mean_squared_error(y_test, y_pred),
-            "rmse": np.sqrt(mean_squared_error(y_test, y_pred)),
-            "mae": mean_absolute_error(y_test, y_pred),
-            "r2": r2_score(y_test, y_pred),
-        }
+        y_pred = model.predict(X_test)
+        metrics = {name: fn(y_test, y_pred) for name, fn in _REG_METRICS}
+        metrics["rmse"] = float(np.sqrt(metrics["mse"]))
 
     else:
         raise ValueError(f"Unsupported model type: {model_type}")
 
     # Log metrics to MLflow
     if use_mlflow:
-        with mlflow.start_run():
-            for metric_name, metric_value in metrics.items():
-                mlflow.log_metric(metric_name, metric_value)
+        with mlflow.start_run(nested=mlflow.active_run() is not None):
+            mlflow.log_metrics(metrics)
 
     return metrics
 
@@ -171,47 +271,65 @@ def tune_hyperparameters(
         y_test: Test data target
         model_type: Type of model ('classification' or 'regression')
         param_grid: Grid of hyperparameters to search
-        cv: Number of cross-validation folds
-        use_mlflow: Whether to log metrics to MLflow
+        cv: Number of cross-validation folds (shuffled, stratified for
+            classification)
+        use_mlflow: Whether to log metrics to MLflow (ignored when the
+            DISABLE_MLFLOW environment variable is "1")
         experiment_name: MLflow experiment name
 
     Returns:
         Tuple of (best_model, best_params)
     """
     logger.info(f"Performing hyperparameter tuning for {model_type} model")
+    use_mlflow = _mlflow_enabled(use_mlflow)
+
+    if model_type == "classification":
+        base_model = LogisticRegression()
+        default_grid = {
+            "C": [0.01, 0.1, 1.0, 10.0],
+            "solver": ["liblinear", "lbfgs"],
+        }
+    else:  # regression
+        base_model = Ridge()
+        default_grid = {
+            "alpha": [0.01, 0.1, 1.0, 10.0],
+            "solver": ["auto", "svd", "cholesky"],
+        }
 
     if param_grid is None:
-        if model_type == "classification":
-            param_grid = {
-                "C": [0.01, 0.1, 1.0, 10.0],
-                "solver": ["liblinear", "lbfgs"],
-            }
-            base_model = LogisticRegression()
-        else:  # regression
-            param_grid = {
-                "alpha": [0.01, 0.1, 1.0, 10.0],
-                "solver": ["auto", "svd", "cholesky"],
-            }
-            base_model = Ridge()
+        param_grid = default_grid
+
+    # The grid search fits on plain arrays; the final refit below uses the
+    # original frame so the best model keeps its feature names
+    X_array, y_array = _as_arrays(X_train, y_train)
+
+    # Shuffle once and materialize the folds so every grid point reuses them
+    if model_type == "classification":
+        splitter = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
+    else:
+        splitter = KFold(n_splits=cv, shuffle=True, random_state=42)
+    splits = list(splitter.split(X_array, y_array))
 
     grid_search = GridSearchCV(
         base_model,
         param_grid,
-        cv=cv,
+        cv=splits,
         scoring=(
             "accuracy"
             if model_type == "classification"
             else "neg_mean_squared_error"
         ),
         n_jobs=-1,
+        refit=False,
     )
 
     # Fit the grid search
-    grid_search.fit(X_train, y_train)
+    grid_search.fit(X_array, y_array)
 
-    # Get best model and parameters
-    best_model = grid_search.best_estimator_
+    # Refit a fresh estimator on the full training set with the best params
     best_params = grid_search.best_params_
+    best_model = clone(base_model).set_params(**best_params)
+    best_model.fit(X_train, y_array)
 
     # Evaluate the best model
     metrics = evaluate_model(
@@ -220,14 +338,12 @@ def tune_hyperparameters(
 
     if use_mlflow:
         mlflow.set_experiment(experiment_name)
-        with mlflow.start_run():
-            # Log best parameters
-            for param, value in best_params.items():
-                mlflow.log_param(param, value)
-
-            # Log evaluation metrics
-            for metric_name, metric_value in metrics.items():
-                mlflow.log_metric(metric_name, metric_value)
+        with mlflow.start_run(nested=mlflow.active_run() is not None):
+            # Log best parameters and evaluation metrics
+            mlflow.log_params(best_params)
+            mlflow.log_metrics(
+                {**metrics, "best_cv_score": grid_search.best_score_}
+            )
 
             # Log best model
             mlflow.sklearn.log_model(best_model, "tuned_model")
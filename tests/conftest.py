@@ -0,0 +1,48 @@
+"""Shared pytest configuration for the test suite."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+_MLFLOW_FUNCTIONS = (
+    "set_experiment",
+    "start_run",
+    "end_run",
+    "log_params",
+    "log_metrics",
+)
+
+
+def pytest_configure(config):
+    """Register the markers used by the test suite."""
+    config.addinivalue_line(
+        "markers",
+        "real_mlflow: log to a throwaway MLflow file store instead of mocks",
+    )
+
+
+@pytest.fixture(autouse=True)
+def mlflow_mocks(request, monkeypatch):
+    """Replace MLflow tracking calls with mocks for every test.
+
+    Keeps the tests from creating experiments and runs under ``mlruns/``.
+    Tests that assert on MLflow calls request this fixture and inspect the
+    returned mocks, keyed by function name.
+
+    Tests marked ``real_mlflow`` keep the real tracking calls and log to a
+    file store in their ``tmp_path`` instead; only the slow model logging
+    is mocked then.
+    """
+    mocks = {}
+    if request.node.get_closest_marker("real_mlflow"):
+        tracking_dir = request.getfixturevalue("tmp_path")
+        monkeypatch.setenv("MLFLOW_TRACKING_URI", tracking_dir.as_uri())
+    else:
+        mocks = {name: MagicMock() for name in _MLFLOW_FUNCTIONS}
+        for name, mock in mocks.items():
+            monkeypatch.setattr(f"mlflow.{name}", mock)
+
+    mocks["log_model"] = MagicMock()
+    monkeypatch.setattr("mlflow.sklearn.log_model", mocks["log_model"])
+
+    return mocks
@@ -1,165 +1,183 @@
 """Unit tests for the FastAPI application."""
 
-# import json
-import unittest
 from unittest.mock import MagicMock, patch
 
-# import pandas as pd
+import pytest
 from fastapi.testclient import TestClient
 
-from src.app.main import app
-
-
-class TestApp(unittest.TestCase):
-    """Tests for the FastAPI application."""
-
-    def setUp(self):
-        """Set up test client and mock model."""
-        self.client = TestClient(app)
-
-    @patch("src.app.main.model")
-    def test_health_check_model_loaded(self, mock_model):
-        """Test health check endpoint when model is loaded."""
-        # Set up mock model
-        mock_model.return_value = MagicMock()
-
-        # Call health check endpoint
-        response = self.client.get("/health")
-
-        # Check response
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(
-            response.json(),
-            {
-                "status": "healthy",
-                "message": "Model is loaded and ready for inference",
-            },
-        )
-
-    @patch("src.app.main.model", None)
-    def test_health_check_model_not_loaded(self):
-        """Test health check endpoint when model is not loaded."""
-        # Call health check endpoint
-        response = self.client.get("/health")
-
-        # Check response
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(
-            response.json(), {"status": "error", "message": "Model not loaded"}
-        )
-
-    @patch("src.app.main.model")
-    def test_predict_binary_classification(self, mock_model):
-        """Test prediction endpoint for binary classification."""
-        # Set up mock model
-        mock_model.predict.return_value = [
-            1
-        ]  # Binary classification prediction
-        mock_model.predict_proba.return_value = [
-            [0.2, 0.8]
-        ]  # Binary classification probabilities
-
-        # Prepare input data
-        input_data = {"features": {"feature1": 0.5, "feature2": 0.7}}
-
-        # Call predict endpoint
-        response = self.client.post("/predict", json=input_data)
-
-        # Check response
-        self.assertEqual(response.status_code, 200)
-        result = response.json()
-        self.assertEqual(result["prediction"], 1)
-        self.assertAlmostEqual(result["probability"], 0.8)
-
-        # Check that the model was called with the correct data
-        mock_model.predict.assert_called_once()
-        mock_model.predict_proba.assert_called_once()
-
-    @patch("src.app.main.model")
-    def test_predict_multiclass_classification(self, mock_model):
-        """Test prediction endpoint for multiclass classification."""
-        # Set up mock model
-        mock_model.predict.return_value = [
-            2
-        ]  # Multiclass classification prediction
-        mock_model.predict_proba.return_value = [
-            [0.1, 0.2, 0.7]
-        ]  # Multiclass probabilities
-
-        # Prepare input data
-        input_data = {"features": {"feature1": 0.5, "feature2": 0.7}}
-
-        # Call predict endpoint
-        response = self.client.post("/predict", json=input_data)
-
-        # Check response
-        self.assertEqual(response.status_code, 200)
-        result = response.json()
-        self.assertEqual(result["prediction"], 2)
-        self.assertEqual(result["confidence"], {"0": 0.1, "1": 0.2, "2": 0.7})
-
-        # Check that the model was called with the correct data
-        mock_model.predict.assert_called_once()
-        mock_model.predict_proba.assert_called_once()
-
-    @patch("src.app.main.model")
-    def test_predict_regression(self, mock_model):
-        """Test prediction endpoint for regression."""
-        # Set up mock model
-        mock_model.predict.return_value = [3.14]  # Regression prediction
-        # Regression models don't have predict_proba
-        delattr(mock_model, "predict_proba")
-
-        # Prepare input data
-        input_data = {"features": {"feature1": 0.5, "feature2": 0.7}}
-
-        # Call predict endpoint
-        response = self.client.post("/predict", json=input_data)
-
-        # Check response
-        self.assertEqual(response.status_code, 200)
-        result = response.json()
-        self.assertEqual(result["prediction"], 3.14)
-        self.assertNotIn("probability", result)
-        self.assertNotIn("confidence", result)
-
-        # Check that the model was called with the correct data
-        mock_model.predict.assert_called_once()
-
-    @patch("src.app.main.model", None)
-    def test_predict_model_not_loaded(self):
-        """Test prediction endpoint when model is not loaded."""
-        # Prepare input data
-        input_data = {"features": {"feature1": 0.5, "feature2": 0.7}}
-
-        # Call predict endpoint
-        response = self.client.post("/predict", json=input_data)
-
-        # Check response
-        self.assertEqual(response.status_code, 503)
-        self.assertEqual(response.json(), {"detail": "Model not loaded"})
-
-    @patch("src.app.main.model")
-    @patch("src.app.main.os.environ")
-    def test_model_info(self, mock_environ, mock_model):
-        """Test model info endpoint."""
-        # Set up environment variables
-        mock_environ.get.side_effect = lambda key, default: {
-            "MODEL_PATH": "models/test_model",
-            "MLFLOW_TRACKING_URI": "http://test-mlflow:5000",
-        }.get(key, default)
-
-        # Call model info endpoint
-        response = self.client.get("/model/info")
-
-        # Check response
-        self.assertEqual(response.status_code, 200)
-        result = response.json()
-        self.assertEqual(result["model_path"], "models/test_model")
-        self.assertEqual(
-            result["mlflow_tracking_uri"], "http://test-mlflow:5000"
-        )
-
-
-if __name__ == "__main__":
-    unittest.main()
+from src.app.main import _unwrap_pyfunc_model, app
+
+
+@pytest.fixture(scope="module")
+def client():
+    """Test client shared by all tests in the module."""
+    return TestClient(app)
+
+
+def test_root(client):
+    """Test root endpoint."""
+    # Call root endpoint twice to exercise the cached response
+    first = client.get("/")
+    second = client.get("/")
+
+    # Check response
+    assert first.status_code == 200
+    assert first.json() == second.json()
+    assert first.json()["endpoints"]["predict"] == "/predict"
+
+
+@patch("src.app.main.model")
+def test_health_check_model_loaded(mock_model, client):
+    """Test health check endpoint when model is loaded."""
+    # Set up mock model
+    mock_model.return_value = MagicMock()
+
+    # Call health check endpoint
+    response = client.get("/health")
+
+    # Check response
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "healthy",
+        "message": "Model is loaded and ready for inference",
+    }
+
+
+@patch("src.app.main.model", None)
+def test_health_check_model_not_loaded(client):
+    """Test health check endpoint when model is not loaded."""
+    # Call health check endpoint
+    response = client.get("/health")
+
+    # Check response
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "error",
+        "message": "Model not loaded",
+    }
+
+
+@patch("src.app.main.model")
+def test_predict_binary_classification(mock_model, client):
+    """Test prediction endpoint for binary classification."""
+    # Set up mock model
+    mock_model.predict.return_value = [1]  # Binary classification prediction
+    mock_model.predict_proba.return_value = [
+        [0.2, 0.8]
+    ]  # Binary classification probabilities
+
+    # Prepare input data
+    input_data = {"features": {"feature1": 0.5, "feature2": 0.7}}
+
+    # Call predict endpoint
+    response = client.post("/predict", json=input_data)
+
+    # Check response
+    assert response.status_code == 200
+    result = response.json()
+    assert result["prediction"] == 1
+    assert result["probability"] == pytest.approx(0.8)
+
+    # Check that the model was called with the correct data
+    mock_model.predict.assert_called_once()
+    mock_model.predict_proba.assert_called_once()
+
+
+@patch("src.app.main.model")
+def test_predict_multiclass_classification(mock_model, client):
+    """Test prediction endpoint for multiclass classification."""
+    # Set up mock model
+    mock_model.predict.return_value = [
+        2
+    ]  # Multiclass classification prediction
+    mock_model.predict_proba.return_value = [
+        [0.1, 0.2, 0.7]
+    ]  # Multiclass probabilities
+
+    # Prepare input data
+    input_data = {"features": {"feature1": 0.5, "feature2": 0.7}}
+
+    # Call predict endpoint
+    response = client.post("/predict", json=input_data)
+
+    # Check response
+    assert response.status_code == 200
+    result = response.json()
+    assert result["prediction"] == 2
+    assert result["confidence"] == {"0": 0.1, "1": 0.2, "2": 0.7}
+
+    # Check that the model was called with the correct data
+    mock_model.predict.assert_called_once()
+    mock_model.predict_proba.assert_called_once()
+
+
+@patch("src.app.main.model")
+def test_predict_regression(mock_model, client):
+    """Test prediction endpoint for regression."""
+    # Set up mock model
+    mock_model.predict.return_value = [3.14]  # Regression prediction
+    # Regression models don't have predict_proba
+    delattr(mock_model, "predict_proba")
+
+    # Prepare input data
+    input_data = {"features": {"feature1": 0.5, "feature2": 0.7}}
+
+    # Call predict endpoint
+    response = client.post("/predict", json=input_data)
+
+    # Check response
+    assert response.status_code == 200
+    result = response.json()
+    assert result["prediction"] == 3.14
+    assert "probability" not in result
+    assert "confidence" not in result
+
+    # Check that the model was called with the correct data
+    mock_model.predict.assert_called_once()
+
+
+@patch("src.app.main.model", None)
+def test_predict_model_not_loaded(client):
+    """Test prediction endpoint when model is not loaded."""
+    # Prepare input data
+    input_data = {"features": {"feature1": 0.5, "feature2": 0.7}}
+
+    # Call predict endpoint
+    response = client.post("/predict", json=input_data)
+
+    # Check response
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Model not loaded"}
+
+
+@patch("src.app.main.model")
+@patch("src.app.main.os.environ")
+def test_model_info(mock_environ, mock_model, client):
+    """Test model info endpoint."""
+    # Set up environment variables
+    mock_environ.get.side_effect = lambda key, default: {
+        "MODEL_PATH": "models/test_model",
+        "MLFLOW_TRACKING_URI": "http://test-mlflow:5000",
+    }.get(key, default)
+
+    # Call model info endpoint
+    response = client.get("/model/info")
+
+    # Check response
+    assert response.status_code == 200
+    result = response.json()
+    assert result["model_path"] == "models/test_model"
+    assert result["mlflow_tracking_uri"] == "http://test-mlflow:5000"
+
+
+def test_unwrap_pyfunc_model():
+    """Test that the raw estimator is extracted from a pyfunc model."""
+    estimator = MagicMock(spec=["predict", "predict_proba"])
+    pyfunc_model = MagicMock(spec=["predict", "_model_impl"])
+    pyfunc_model._model_impl = estimator
+
+    assert _unwrap_pyfunc_model(pyfunc_model) is estimator
+
+    # Models without an implementation are returned unchanged
+    plain_model = MagicMock(spec=["predict"])
+    assert _unwrap_pyfunc_model(plain_model) is plain_model
@@ -1,11 +1,8 @@
 """Unit tests for data preprocessing module."""
 
-import os
-import tempfile
-import unittest
-
 import numpy as np
 import pandas as pd
+import pytest
 from sklearn.preprocessing import StandardScaler
 
 from src.data.preprocessing import (
@@ -16,103 +13,151 @@ from src.data.preprocessing import (
 )
 
 
-class TestDataPreprocessing(unittest.TestCase):
-    """Tests for data preprocessing functions."""
-
-    def setUp(self):
-        """Set up test data."""
-        # Create a test DataFrame
-        self.df = pd.DataFrame(
-            {
-                "numeric_col": [1, 2, np.nan, 4, 5],
-                "categorical_col": ["A", "B", "C", np.nan, "A"],
-                "target": [0, 1, 0, 1, 0],
-            }
-        )
-
-        # Create a temporary CSV file
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.temp_file = os.path.join(self.temp_dir.name, "test_data.csv")
-        self.df.to_csv(self.temp_file, index=False)
-
-    def tearDown(self):
-        """Clean up temporary files."""
-        self.temp_dir.cleanup()
-
-    def test_load_data(self):
-        """Test load_data function."""
-        loaded_df = load_data(self.temp_file)
-
-        # Check that the loaded DataFrame has the same shape and columns
-        self.assertEqual(loaded_df.shape, self.df.shape)
-        self.assertListEqual(list(loaded_df.columns), list(self.df.columns))
-
-    def test_clean_data(self):
-        """Test clean_data function."""
-        cleaned_df = clean_data(self.df.copy())
-
-        # Check that there are no missing values
-        self.assertEqual(cleaned_df.isna().sum().sum(), 0)
-
-        # Check that numeric missing values are filled with median
-        self.assertEqual(
-            cleaned_df.loc[2, "numeric_col"], 3.0
-        )  # Median of [1, 2, 4, 5]
-
-        # Check that categorical missing values are filled with mode
-        self.assertEqual(
-            cleaned_df.loc[3, "categorical_col"], "A"
-        )  # Mode of ['A', 'B', 'C', 'A']
-
-    def test_split_data(self):
-        """Test split_data function."""
-        # Create a clean DataFrame for splitting
-        df = pd.DataFrame(
-            {
-                "feature1": range(100),
-                "feature2": range(100),
-                "target": [i % 2 for i in range(100)],
-            }
-        )
-
-        X_train, X_test, y_train, y_test = split_data(
-            df, "target", test_size=0.2, random_state=42
-        )
-
-        # Check that the splits have the correct shapes
-        self.assertEqual(X_train.shape[0], 80)  # 80% of 100
-        self.assertEqual(X_test.shape[0], 20)  # 20% of 100
-        self.assertEqual(y_train.shape[0], 80)
-        self.assertEqual(y_test.shape[0], 20)
-
-        # Check that 'target' is not in the feature DataFrames
-        self.assertNotIn("target", X_train.columns)
-        self.assertNotIn("target", X_test.columns)
-
-    def test_scale_features(self):
-        """Test scale_features function."""
-        # Create DataFrames for scaling
-        X_train = pd.DataFrame(
-            {"feature1": [1, 2, 3, 4, 5], "feature2": [10, 20, 30, 40, 50]}
-        )
-
-        X_test = pd.DataFrame({"feature1": [6, 7], "feature2": [60, 70]})
-
-        X_train_scaled, X_test_scaled, scaler = scale_features(X_train, X_test)
-
-        # Check that the scaled DataFrames have the same shape
-        self.assertEqual(X_train_scaled.shape, X_train.shape)
-        self.assertEqual(X_test_scaled.shape, X_test.shape)
-
-        # Check that the scaler is a StandardScaler
-        self.assertIsInstance(scaler, StandardScaler)
-
-        # Check that the mean of the scaled training data is approximately 0
-        self.assertAlmostEqual(X_train_scaled["feature1"].mean(), 0, places=10)
-        self.assertAlmostEqual(X_train_scaled["feature2"].mean(), 0, places=10)
-        self.assertAlmostEqual(X_train_scaled["feature1"].std(), 1, places=10)
-        self.assertAlmostEqual(X_train_scaled["feature2"].std(), 1, places=10)
-
-
-if __name__ == "__main__":
-    unittest.main()
+@pytest.fixture(scope="module")
+def df():
+    """Test DataFrame with missing values, shared by all tests."""
+    return pd.DataFrame(
+        {
+            "numeric_col": [1, 2, np.nan, 4, 5],
+            "categorical_col": ["A", "B", "C", np.nan, "A"],
+            "target": [0, 1, 0, 1, 0],
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def csv_file(df, tmp_path_factory):
+    """Temporary CSV copy of the test DataFrame, written once."""
+    path = tmp_path_factory.mktemp("data") / "test_data.csv"
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_load_data(df, csv_file):
+    """Test load_data function."""
+    loaded_df = load_data(csv_file)
+
+    # Check that the loaded DataFrame has the same shape and columns
+    assert loaded_df.shape == df.shape
+    assert list(loaded_df.columns) == list(df.columns)
+
+
+def test_clean_data(df):
+    """Test clean_data function."""
+    cleaned_df = clean_data(df.copy())
+
+    # Check that there are no missing values
+    assert cleaned_df.isna().sum().sum() == 0
+
+    # Check that numeric missing values are filled with median
+    assert cleaned_df.loc[2, "numeric_col"] == 3.0  # Median of [1, 2, 4, 5]
+
+    # Check that categorical missing values are filled with mode
+    assert cleaned_df.loc[3, "categorical_col"] == "A"  # Mode of A, B, C, A
+
+
+def test_clean_data_without_missing_values(df):
+    """Test clean_data leaves complete data untouched."""
+    complete_df = df.dropna()
+
+    cleaned_df = clean_data(complete_df)
+
+    pd.testing.assert_frame_equal(cleaned_df, complete_df)
+
+
+def test_split_data():
+    """Test split_data function."""
+    # Create a clean DataFrame for splitting
+    values = np.arange(100)
+    df = pd.DataFrame(
+        {"feature1": values, "feature2": values, "target": values & 1}
+    )
+
+    X_train, X_test, y_train, y_test = split_data(
+        df, "target", test_size=0.2, random_state=42
+    )
+
+    # Check that the splits have the correct shapes
+    assert X_train.shape[0] == 80  # 80% of 100
+    assert X_test.shape[0] == 20  # 20% of 100
+    assert y_train.shape[0] == 80
+    assert y_test.shape[0] == 20
+
+    # Check that 'target' is not in the feature DataFrames
+    assert "target" not in X_train.columns
+    assert "target" not in X_test.columns
+
+
+def test_scale_features():
+    """Test scale_features function."""
+    # Create DataFrames for scaling
+    X_train = pd.DataFrame(
+        {"feature1": [1, 2, 3, 4, 5], "feature2": [10, 20, 30, 40, 50]}
+    )
+
+    X_test = pd.DataFrame({"feature1": [6, 7], "feature2": [60, 70]})
+
+    X_train_scaled, X_test_scaled, scaler = scale_features(X_train, X_test)
+
+    # Check that the scaled arrays have the same shape
+    assert X_train_scaled.shape == X_train.shape
+    assert X_test_scaled.shape == X_test.shape
+
+    # Check that the scaler is a StandardScaler
+    assert isinstance(scaler, StandardScaler)
+
+    # Check that the scaled training data has zero mean and unit variance
+    np.testing.assert_allclose(X_train_scaled.mean(axis=0), 0, atol=1e-10)
+    np.testing.assert_allclose(X_train_scaled.std(axis=0), 1, atol=1e-10)
+
+
+def test_scale_features_numba():
+    """Test scale_features numba path matches StandardScaler."""
+    pytest.importorskip("numba")
+    X_train = pd.DataFrame(
+        {
+            "feature1": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "feature2": [10.0, 20.0, 30.0, 40.0, 50.0],
+            "constant": [7.0] * 5,
+        }
+    )
+    X_test = pd.DataFrame(
+        {"feature1": [6.0], "feature2": [60.0], "constant": [7.0]}
+    )
+
+    expected_train, expected_test, expected_scaler = scale_features(
+        X_train, X_test
+    )
+    X_train_scaled, X_test_scaled, scaler = scale_features(
+        X_train, X_test, use_numba=True
+    )
+
+    # Check that both paths produce the same scaling
+    np.testing.assert_allclose(X_train_scaled, expected_train)
+    np.testing.assert_allclose(X_test_scaled, expected_test)
+    np.testing.assert_allclose(scaler.mean_, expected_scaler.mean_)
+    np.testing.assert_allclose(scaler.scale_, expected_scaler.scale_)
+
+
+def test_scale_features_numba_near_constant():
+    """Test the numba path treats near-constant columns like StandardScaler."""
+    pytest.importorskip("numba")
+    X_train = pd.DataFrame({"near_constant": [1.0] * 999 + [1.0 + 1e-12]})
+
+    expected_train, _, expected_scaler = scale_features(X_train)
+    X_train_scaled, _, scaler = scale_features(X_train, use_numba=True)
+
+    # Check that rounding noise is not blown up into large values
+    np.testing.assert_array_equal(scaler.scale_, expected_scaler.scale_)
+    np.testing.assert_allclose(X_train_scaled, expected_train, atol=1e-9)
+
+
+def test_scale_features_numba_missing_values():
+    """Test the numba path falls back to StandardScaler on missing values."""
+    X_train = pd.DataFrame({"a": [1.0, 2.0, np.nan, 4.0]})
+
+    expected_train, _, expected_scaler = scale_features(X_train)
+    X_train_scaled, _, scaler = scale_features(X_train, use_numba=True)
+
+    np.testing.assert_allclose(X_train_scaled, expected_train)
+    np.testing.assert_allclose(scaler.mean_, expected_scaler.mean_)
@@ -1,252 +1,356 @@
 """Unit tests for model training module."""
 
-import unittest
 from unittest.mock import MagicMock, patch
 
+import mlflow
 import numpy as np
 import pandas as pd
+import pytest
 from sklearn.linear_model import LogisticRegression, Ridge
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 
-from src.models.train import evaluate_model, train_model, tune_hyperparameters
+from src.app.mock_model import MockModel
+from src.models.train import (
+    evaluate_model,
+    train_model,
+    tune_hyperparameters,
+)
+
+
+def _split_frames(X, y, n_train=100):
+    """Split feature and target arrays into train/test frames."""
+    columns = ["feature1", "feature2"]
+    return (
+        pd.DataFrame(X[:n_train], columns=columns),
+        pd.Series(y[:n_train]),
+        pd.DataFrame(X[n_train:], columns=columns),
+        pd.Series(y[n_train:]),
+    )
+
+
+@pytest.fixture(scope="module")
+def random_values():
+    """One block of uniform random values for all test datasets."""
+    return np.random.default_rng(42).random((120, 6))
+
+
+@pytest.fixture(scope="module")
+def classification_data(random_values):
+    """Classification data shared by all tests in the module."""
+    labels = (random_values[:, 2] >= 0.5).astype(int)
+    return _split_frames(random_values[:, :2], labels)
+
+
+@pytest.fixture(scope="module")
+def regression_data(random_values):
+    """Regression data shared by all tests in the module."""
+    return _split_frames(random_values[:, 3:5], random_values[:, 5])
+
+
+@pytest.mark.parametrize(
+    "model_type, model_params, expected_cls, expected_attrs",
+    [
+        ("classification", {"C": 1.0}, LogisticRegression, {}),
+        ("regression", {"alpha": 0.5}, Ridge, {}),
+        (
+            "classification",
+            {
+                "model_name": "random_forest",
+                "n_estimators": 10,
+                "max_depth": 2,
+                "random_state": 0,
+            },
+            RandomForestClassifier,
+            {"n_estimators": 10, "n_jobs": None},
+        ),
+        (
+            "regression",
+            {
+                "model_name": "random_forest",
+                "n_estimators": 15,
+                "max_depth": 2,
+                "random_state": 0,
+            },
+            RandomForestRegressor,
+            {"n_estimators": 15, "n_jobs": None},
+        ),
+    ],
+)
+def test_train_model(
+    request,
+    model_type,
+    model_params,
+    expected_cls,
+    expected_attrs,
+    mlflow_mocks,
+):
+    """Test training each supported model."""
+    X_train, y_train, _, _ = request.getfixturevalue(f"{model_type}_data")
+
+    model = train_model(
+        X_train,
+        y_train,
+        model_type=model_type,
+        model_params=model_params,
+        use_mlflow=True,
+    )
+
+    # Check the model class and its constructor parameters
+    assert isinstance(model, expected_cls)
+    for name, value in expected_attrs.items():
+        assert getattr(model, name) == value
+
+    # Check that MLflow functions were called
+    mlflow_mocks["start_run"].assert_called_once()
+    mlflow_mocks["log_params"].assert_called_once_with(
+        {"model_type": model_type, **model_params}
+    )
+    mlflow_mocks["log_model"].assert_called_once()
+    mlflow_mocks["end_run"].assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "model_params, expected_n_jobs",
+    [
+        ({}, None),
+        ({"n_jobs": 2}, 2),
+    ],
+)
+def test_train_model_forest_n_jobs(
+    classification_data, model_params, expected_n_jobs
+):
+    """Test that forests fit on all cores but keep n_jobs off for predict."""
+    X_train, y_train, _, _ = classification_data
+    model_params = {"model_name": "random_forest", **model_params}
+
+    fit_n_jobs = []
+    fit = RandomForestClassifier.fit
+
+    def record_fit(self, *args, **kwargs):
+        fit_n_jobs.append(self.n_jobs)
+        return fit(self, *args, **kwargs)
+
+    with patch.object(RandomForestClassifier, "fit", record_fit):
+        model = train_model(
+            X_train, y_train, model_params=model_params, use_mlflow=False
+        )
 
+    assert fit_n_jobs == [model_params.get("n_jobs", -1)]
+    assert model.n_jobs == expected_n_jobs
+
+
+def test_train_model_rejects_reordered_columns(classification_data):
+    """Test that trained models keep their feature names."""
+    X_train, y_train, X_test, _ = classification_data
+
+    model = train_model(X_train, y_train, use_mlflow=False)
+
+    assert list(model.feature_names_in_) == list(X_train.columns)
+    with pytest.raises(ValueError, match="feature names"):
+        model.predict(X_test[X_test.columns[::-1]])
+
+
+@pytest.mark.parametrize(
+    "model_type, model_params, expected_cls, expected_dtype",
+    [
+        ("regression", {}, Ridge, np.float32),
+        (
+            "classification",
+            {"solver": "liblinear"},
+            LogisticRegression,
+            np.float32,
+        ),
+        # lbfgs upcasts to float64 itself, so its input is left as is
+        ("classification", {}, LogisticRegression, np.float64),
+    ],
+)
+def test_train_model_feature_dtype(
+    request, model_type, model_params, expected_cls, expected_dtype
+):
+    """Test that features are only downcast for estimators that keep it."""
+    X_train, y_train, _, _ = request.getfixturevalue(f"{model_type}_data")
+
+    with patch.object(
+        expected_cls, "fit", autospec=True, side_effect=expected_cls.fit
+    ) as mock_fit:
+        train_model(
+            X_train,
+            y_train,
+            model_type=model_type,
+            model_params=model_params,
+            use_mlflow=False,
+        )
 
-class TestModelTraining(unittest.TestCase):
-    """Tests for model training functions."""
+    assert (mock_fit.call_args.args[1].dtypes == expected_dtype).all()
 
-    def setUp(self):
-        """Set up test data."""
-        # Create test data for classification
-        np.random.seed(42)
-        self.X_train_cls = pd.DataFrame(
-            {"feature1": np.random.rand(100), "feature2": np.random.rand(100)}
-        )
-        self.y_train_cls = pd.Series(np.random.randint(0, 2, 100))
 
-        self.X_test_cls = pd.DataFrame(
-            {"feature1": np.random.rand(20), "feature2": np.random.rand(20)}
-        )
-        self.y_test_cls = pd.Series(np.random.randint(0, 2, 20))
+def test_evaluate_classification_model(classification_data, mlflow_mocks):
+    """Test evaluating a classification model."""
+    X_train, y_train, X_test, y_test = classification_data
 
-        # Create test data for regression
-        self.X_train_reg = pd.DataFrame(
-            {"feature1": np.random.rand(100), "feature2": np.random.rand(100)}
-        )
-        self.y_train_reg = pd.Series(np.random.rand(100))
+    # Train a simple model
+    model = LogisticRegression(solver="liblinear", max_iter=50)
+    model.fit(X_train, y_train)
 
-        self.X_test_reg = pd.DataFrame(
-            {"feature1": np.random.rand(20), "feature2": np.random.rand(20)}
-        )
-        self.y_test_reg = pd.Series(np.random.rand(20))
-
-    @patch("mlflow.start_run")
-    @patch("mlflow.log_param")
-    @patch("mlflow.sklearn.log_model")
-    @patch("mlflow.end_run")
-    def test_train_classification_model(
-        self, mock_end_run, mock_log_model, mock_log_param, mock_start_run
-    ):
-        """Test training a classification model."""
-        # Mock MLflow context
-        mock_start_run.return_value = MagicMock()
-
-        # Train a logistic regression model
-        model = train_model(
-            self.X_train_cls,
-            self.y_train_cls,
-            model_type="classification",
-            model_params={"C": 1.0},
-            use_mlflow=True,
-        )
+    # Evaluate the model
+    metrics = evaluate_model(
+        model, X_test, y_test, model_type="classification", use_mlflow=True
+    )
 
-        # Check that the model is a LogisticRegression
-        self.assertIsInstance(model, LogisticRegression)
-
-        # Check that MLflow functions were called
-        mock_start_run.assert_called_once()
-        mock_log_param.assert_any_call("model_type", "classification")
-        mock_log_param.assert_any_call("C", 1.0)
-        mock_log_model.assert_called_once()
-        mock_end_run.assert_called_once()
-
-    @patch("mlflow.start_run")
-    @patch("mlflow.log_param")
-    @patch("mlflow.sklearn.log_model")
-    @patch("mlflow.end_run")
-    def test_train_regression_model(
-        self, mock_end_run, mock_log_model, mock_log_param, mock_start_run
-    ):
-        """Test training a regression model."""
-        # Mock MLflow context
-        mock_start_run.return_value = MagicMock()
-
-        # Train a ridge regression model
-        model = train_model(
-            self.X_train_reg,
-            self.y_train_reg,
-            model_type="regression",
-            model_params={"alpha": 0.5},
-            use_mlflow=True,
-        )
+    # Check that metrics are returned
+    for name in ("accuracy", "precision", "recall", "f1"):
+        assert name in metrics
 
-        # Check that the model is a Ridge regressor
-        self.assertIsInstance(model, Ridge)
-
-        # Check that MLflow functions were called
-        mock_start_run.assert_called_once()
-        mock_log_param.assert_any_call("model_type", "regression")
-        mock_log_param.assert_any_call("alpha", 0.5)
-        mock_log_model.assert_called_once()
-        mock_end_run.assert_called_once()
-
-    @patch("mlflow.start_run")
-    @patch("mlflow.log_param")
-    @patch("mlflow.sklearn.log_model")
-    @patch("mlflow.end_run")
-    def test_train_random_forest(
-        self, mock_end_run, mock_log_model, mock_log_param, mock_start_run
-    ):
-        """Test training a random forest model."""
-        # Mock MLflow context
-        mock_start_run.return_value = MagicMock()
-
-        # Train a random forest classifier
-        model = train_model(
-            self.X_train_cls,
-            self.y_train_cls,
-            model_type="classification",
-            model_params={"model_name": "random_forest", "n_estimators": 10},
-            use_mlflow=True,
-        )
+    # Check that MLflow functions were called
+    mlflow_mocks["start_run"].assert_called_once()
+    # All metrics should be logged in one call
+    mlflow_mocks["log_metrics"].assert_called_once_with(metrics)
 
-        # Check that the model is a RandomForestClassifier
-        self.assertIsInstance(model, RandomForestClassifier)
-        self.assertEqual(model.n_estimators, 10)
 
-        # Train a random forest regressor
-        model = train_model(
-            self.X_train_reg,
-            self.y_train_reg,
-            model_type="regression",
-            model_params={"model_name": "random_forest", "n_estimators": 15},
-            use_mlflow=True,
-        )
+def test_evaluate_single_class_test_set(classification_data):
+    """Test that ROC AUC is skipped when y_test holds a single class."""
+    X_train, y_train, X_test, y_test = classification_data
+    model = LogisticRegression(solver="liblinear", max_iter=50)
+    model.fit(X_train, y_train)
 
-        # Check that the model is a RandomForestRegressor
-        self.assertIsInstance(model, RandomForestRegressor)
-        self.assertEqual(model.n_estimators, 15)
-
-    @patch("mlflow.start_run")
-    @patch("mlflow.log_metric")
-    def test_evaluate_classification_model(
-        self, mock_log_metric, mock_start_run
-    ):
-        """Test evaluating a classification model."""
-        # Mock MLflow context
-        mock_start_run.return_value = MagicMock()
-        mock_start_run.return_value.__enter__.return_value = MagicMock()
-
-        # Train a simple model
-        model = LogisticRegression()
-        model.fit(self.X_train_cls, self.y_train_cls)
-
-        # Evaluate the model
-        metrics = evaluate_model(
-            model,
-            self.X_test_cls,
-            self.y_test_cls,
-            model_type="classification",
-            use_mlflow=True,
-        )
+    single_class = y_test == 1
+    metrics = evaluate_model(
+        model,
+        X_test[single_class],
+        y_test[single_class],
+        model_type="classification",
+        use_mlflow=False,
+    )
 
-        # Check that metrics are returned
-        self.assertIn("accuracy", metrics)
-        self.assertIn("precision", metrics)
-        self.assertIn("recall", metrics)
-        self.assertIn("f1", metrics)
-
-        # Check that MLflow functions were called
-        mock_start_run.assert_called_once()
-        self.assertEqual(
-            mock_log_metric.call_count, 4
-        )  # Four metrics should be logged
-
-    @patch("mlflow.start_run")
-    @patch("mlflow.log_metric")
-    def test_evaluate_regression_model(self, mock_log_metric, mock_start_run):
-        """Test evaluating a regression model."""
-        # Mock MLflow context
-        mock_start_run.return_value = MagicMock()
-        mock_start_run.return_value.__enter__.return_value = MagicMock()
-
-        # Train a simple model
-        model = Ridge()
-        model.fit(self.X_train_reg, self.y_train_reg)
-
-        # Evaluate the model
-        metrics = evaluate_model(
-            model,
-            self.X_test_reg,
-            self.y_test_reg,
-            model_type="regression",
-            use_mlflow=True,
-        )
+    assert "accuracy" in metrics
+    assert "roc_auc" not in metrics
+
+
+def test_evaluate_model_with_list_classes(classification_data):
+    """Test evaluating a predict_proba model whose classes_ is a list."""
+    _, _, X_test, y_test = classification_data
+
+    # MockModel always predicts class 0 out of classes_ = [0, 1, 2]
+    model = MockModel()
+    metrics = evaluate_model(
+        model, X_test, y_test, model_type="classification", use_mlflow=False
+    )
+
+    assert metrics["accuracy"] == pytest.approx((y_test == 0).mean())
+    assert "roc_auc" not in metrics
+
+
+def test_evaluate_multiclass_model_without_classes(classification_data):
+    """Test that predict_proba is skipped for multiclass models."""
+    _, _, X_test, _ = classification_data
+    y_test = pd.Series(np.arange(len(X_test)) % 3)
+
+    model = MagicMock(spec=["predict", "predict_proba"])
+    model.predict.return_value = y_test.to_numpy()
+    metrics = evaluate_model(
+        model, X_test, y_test, model_type="classification", use_mlflow=False
+    )
+
+    assert metrics["accuracy"] == 1.0
+    assert "roc_auc" not in metrics
+    model.predict_proba.assert_not_called()
+
+
+def test_evaluate_regression_model(regression_data, mlflow_mocks):
+    """Test evaluating a regression model."""
+    X_train, y_train, X_test, y_test = regression_data
+
+    # Train a simple model
+    model = Ridge(solver="cholesky")
+    model.fit(X_train, y_train)
+
+    # Evaluate the model
+    metrics = evaluate_model(
+        model, X_test, y_test, model_type="regression", use_mlflow=True
+    )
+
+    # Check that metrics are returned
+    for name in ("mse", "rmse", "mae", "r2"):
+        assert name in metrics
+
+    # Check that MLflow functions were called
+    mlflow_mocks["start_run"].assert_called_once()
+    # All metrics should be logged in one call
+    mlflow_mocks["log_metrics"].assert_called_once_with(metrics)
+
+
+def test_tune_hyperparameters(classification_data, mlflow_mocks):
+    """Test hyperparameter tuning."""
+    X_train, y_train, X_test, y_test = classification_data
+
+    # Define a simple parameter grid
+    param_grid = {"C": [0.1, 1.0], "solver": ["liblinear"]}
+
+    # Tune hyperparameters
+    best_model, best_params = tune_hyperparameters(
+        X_train,
+        y_train,
+        X_test,
+        y_test,
+        model_type="classification",
+        param_grid=param_grid,
+        cv=2,
+        use_mlflow=True,
+        experiment_name="test_tuning",
+    )
+
+    # Check that a model and parameters are returned
+    assert isinstance(best_model, LogisticRegression)
+    assert "C" in best_params
+    assert list(best_model.feature_names_in_) == list(X_train.columns)
+
+    # Check that MLflow functions were called
+    mlflow_mocks["set_experiment"].assert_called_once_with("test_tuning")
+    mlflow_mocks["start_run"].assert_called_once()
+    mlflow_mocks["log_model"].assert_called_once()
+
+
+def test_disable_mlflow_env(classification_data, mlflow_mocks, monkeypatch):
+    """Test that DISABLE_MLFLOW=1 skips all MLflow calls."""
+    X_train, y_train, X_test, y_test = classification_data
+    monkeypatch.setenv("DISABLE_MLFLOW", "1")
+
+    model = train_model(X_train, y_train, use_mlflow=True)
+    evaluate_model(model, X_test, y_test, use_mlflow=True)
+
+    for mock in mlflow_mocks.values():
+        mock.assert_not_called()
 
-        # Check that metrics are returned
-        self.assertIn("mse", metrics)
-        self.assertIn("rmse", metrics)
-        self.assertIn("mae", metrics)
-        self.assertIn("r2", metrics)
-
-        # Check that MLflow functions were called
-        mock_start_run.assert_called_once()
-        self.assertEqual(
-            mock_log_metric.call_count, 4
-        )  # Four metrics should be logged
-
-    @patch("mlflow.set_experiment")
-    @patch("mlflow.start_run")
-    @patch("mlflow.log_param")
-    @patch("mlflow.log_metric")
-    @patch("mlflow.sklearn.log_model")
-    def test_tune_hyperparameters(
-        self,
-        mock_log_model,
-        mock_log_metric,
-        mock_log_param,
-        mock_start_run,
-        mock_set_experiment,
-    ):
-        """Test hyperparameter tuning."""
-        # Mock MLflow context
-        mock_start_run.return_value = MagicMock()
-        mock_start_run.return_value.__enter__.return_value = MagicMock()
-
-        # Define a simple parameter grid
-        param_grid = {"C": [0.1, 1.0]}
-
-        # Tune hyperparameters
-        best_model, best_params = tune_hyperparameters(
-            self.X_train_cls,
-            self.y_train_cls,
-            self.X_test_cls,
-            self.y_test_cls,
-            model_type="classification",
-            param_grid=param_grid,
-            cv=2,
-            use_mlflow=True,
-            experiment_name="test_tuning",
-        )
 
-        # Check that a model and parameters are returned
-        self.assertIsInstance(best_model, LogisticRegression)
-        self.assertIn("C", best_params)
+@pytest.mark.real_mlflow
+def test_runs_follow_experiment_switches(classification_data):
+    """Test that evaluate runs land in the most recently trained experiment."""
+    X_train, y_train, X_test, y_test = classification_data
+
+    for experiment_name in ("A", "B", "A"):
+        model = train_model(X_train, y_train, experiment_name=experiment_name)
+        evaluate_model(model, X_test, y_test)
+
+    # Each train_model run is followed by its own evaluate_model run
+    for experiment_name, n_runs in (("A", 4), ("B", 2)):
+        runs = mlflow.search_runs(experiment_names=[experiment_name])
+        assert len(runs) == n_runs
 
-        # Check that MLflow functions were called
-        mock_set_experiment.assert_called_once_with("test_tuning")
-        mock_start_run.assert_called_once()
-        mock_log_model.assert_called_once()
 
+@pytest.mark.real_mlflow
+def test_runs_nest_under_active_run(classification_data):
+    """Test that training and evaluation nest under the caller's run."""
+    X_train, y_train, X_test, y_test = classification_data
+
+    mlflow.set_experiment("outer")
+    with mlflow.start_run() as outer_run:
+        model = train_model(X_train, y_train, experiment_name="outer")
+        evaluate_model(model, X_test, y_test)
+
+        # The caller's run is still the active one afterwards
+        assert mlflow.active_run().info.run_id == outer_run.info.run_id
 
-if __name__ == "__main__":
-    unittest.main()
+    runs = mlflow.search_runs(experiment_names=["outer"])
+    child_runs = runs[runs["tags.mlflow.parentRunId"] == outer_run.info.run_id]
+    assert len(runs) == 3
+    assert len(child_runs) == 2